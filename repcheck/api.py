@@ -0,0 +1,185 @@
+"""Embeddable asyncio API for checking projects.
+
+Example::
+
+    async for result in check_project(root, "python", jobs=4):
+        print(result["path"], result["overall_passed"])
+"""
+
+import os
+import asyncio
+from pathlib import Path
+from typing import AsyncIterator, Awaitable, Callable, List, Dict, Any, Optional
+
+from repcheck.core.base_checker import BaseScriptChecker
+from repcheck.languages.r.checker import RScriptChecker
+from repcheck.languages.r.resolver import RScriptOrderResolver
+from repcheck.languages.python.checker import PythonScriptChecker
+from repcheck.languages.python.resolver import PythonScriptOrderResolver
+
+# Language configurations
+LANGUAGE_CONFIG = {
+    "r": {
+        "checker": RScriptChecker,
+        "resolver": RScriptOrderResolver,
+        "patterns": ["**/*.[Rr]"],
+        "name": "R"
+    },
+    "python": {
+        "checker": PythonScriptChecker,
+        "resolver": PythonScriptOrderResolver,
+        "patterns": ["**/*.py"],
+        "name": "Python"
+    }
+}
+
+# Scripts of any supported language are never outputs
+SCRIPT_PATTERNS = [p for config in LANGUAGE_CONFIG.values() for p in config["patterns"]]
+
+def plan_project(
+    root: Path,
+    language: str = "r",
+    patterns: Optional[List[str]] = None,
+    exclude: Optional[List[str]] = None,
+    checker: Optional[BaseScriptChecker] = None
+) -> Dict[str, Any]:
+    """Find a project's scripts and resolve the order check_project runs them in.
+
+    When the dependencies are circular, the scripts run one at a time in
+    discovery order.
+    """
+    if language not in LANGUAGE_CONFIG:
+        raise ValueError(f"Unsupported language: {language}")
+
+    config = LANGUAGE_CONFIG[language]
+    checker = checker or config["checker"]()
+    resolver = config["resolver"]()
+
+    scripts = checker.find_scripts(root, patterns or config["patterns"], exclude or [])
+    order_result = resolver.resolve_execution_order(scripts)
+
+    if order_result["has_circular_dependency"]:
+        execution_order = [str(s.resolve()) for s in scripts]
+        dependencies = {p: execution_order[i - 1:i] for i, p in enumerate(execution_order)}
+    else:
+        execution_order = list(dict.fromkeys(order_result["execution_order"]))
+        dependencies = order_result["dependency_graph"]
+
+    return {
+        "root": str(root),
+        "language": language,
+        "scripts": scripts,
+        "execution_order": execution_order,
+        "dependency_graph": order_result["dependency_graph"],
+        "run_after": dependencies,
+        "has_circular_dependency": order_result["has_circular_dependency"]
+    }
+
+async def check_project(
+    root: Path,
+    language: str = "r",
+    jobs: int = 1,
+    patterns: Optional[List[str]] = None,
+    exclude: Optional[List[str]] = None,
+    lint: bool = True,
+    preflight: bool = True,
+    timeout: Optional[int] = None,
+    checker: Optional[BaseScriptChecker] = None,
+    plan: Optional[Dict[str, Any]] = None,
+    on_finish: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None,
+    stdout_dir: Optional[Path] = None,
+    blocked: Optional[Dict[str, List[str]]] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """Check a project's scripts, yielding each result as soon as it is ready.
+
+    Up to `jobs` scripts run at once, and a script only starts after the
+    scripts it depends on have finished. At most `jobs` finished results are
+    buffered, so a slow consumer stops new scripts from starting. Closing or
+    cancelling the iterator kills the running subprocesses. Each result
+    carries its position in the execution order under "execution_order".
+
+    `timeout` (seconds per script) configures the checker created here; a
+    caller passing its own `checker` sets the timeout on it instead, and
+    passing both raises ValueError. A passed checker is not modified, so it
+    can be shared between projects; traced runs save their traces under
+    `root`. Pass the result of plan_project as `plan`
+    to reuse an order that was already resolved (e.g. to display it).
+    `on_finish` is awaited for each result before its dependents start.
+    With `stdout_dir`, each script's stdout is streamed to
+    ``<stdout_dir>/<script path relative to root>.out`` instead of being held
+    in memory; the result names that file under "stdout_file".
+    Pass the result of checker.preflight_async as `blocked` to reuse a
+    pre-flight check that already ran (e.g. to report it up front).
+    """
+    if language not in LANGUAGE_CONFIG:
+        raise ValueError(f"Unsupported language: {language}")
+    if checker is not None and timeout is not None:
+        raise ValueError("Pass either timeout or checker, not both; set the timeout on the checker")
+
+    config = LANGUAGE_CONFIG[language]
+    if checker is None:
+        checker = config["checker"]() if timeout is None else config["checker"](timeout=timeout)
+    # Walks and parses the project, so run it off the event loop
+    plan = plan or await asyncio.to_thread(plan_project, root, language, patterns, exclude, checker)
+
+    execution_order = plan["execution_order"]
+    if not execution_order:
+        return
+
+    if blocked is None:
+        blocked = {}
+        if preflight:
+            blocked = await checker.preflight_async(plan["scripts"], plan["dependency_graph"])
+
+    position = {p: i for i, p in enumerate(execution_order, 1)}
+    pending = {p: set(plan["run_after"].get(p, ())) for p in execution_order}
+    ready: asyncio.Queue = asyncio.Queue()
+    results: asyncio.Queue = asyncio.Queue(maxsize=max(jobs, 1))
+
+    def release(finished: str) -> None:
+        for path in execution_order:
+            deps = pending.get(path)
+            if deps is not None and finished in deps:
+                deps.discard(finished)
+                if not deps:
+                    del pending[path]
+                    ready.put_nowait(path)
+
+    async def worker() -> None:
+        while True:
+            path = await ready.get()
+            if path in blocked:
+                result = checker.skipped_result(Path(path), blocked[path])
+            else:
+                stdout_path = None
+                if stdout_dir is not None:
+                    stdout_path = Path(stdout_dir) / f"{os.path.relpath(path, Path(root).resolve())}.out"
+                # Traces go under this run's root, whatever else the checker is used for
+                result = await checker.check_script_async(Path(path), lint, stdout_path, Path(root))
+            result["execution_order"] = position[path]
+            if on_finish:
+                await on_finish(result)
+            # Blocks while the consumer is behind
+            await results.put(result)
+            release(path)
+
+    for path in [p for p, deps in pending.items() if not deps]:
+        del pending[path]
+        ready.put_nowait(path)
+
+    workers = [asyncio.create_task(worker()) for _ in range(max(jobs, 1))]
+    try:
+        for _ in execution_order:
+            get = asyncio.create_task(results.get())
+            await asyncio.wait({get, *workers}, return_when=asyncio.FIRST_COMPLETED)
+            if not get.done():
+                get.cancel()
+                # A worker crashed; surface its exception
+                for task in workers:
+                    if task.done():
+                        task.result()
+            yield get.result()
+    finally:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
@@ -1,12 +1,45 @@
+import shlex
+import asyncio
 from abc import ABC, abstractmethod
+from contextlib import ExitStack, asynccontextmanager
 from pathlib import Path
-from typing import List, Dict, Any
+from time import perf_counter
+from typing import List, Dict, Any, AsyncIterator, Optional, Set, Tuple, ContextManager, TypeVar
+
+from repcheck.core.io_tracer import IOTracer, save_trace
+
+# (command, environment or None to inherit, tracer or None when not tracing)
+ScriptCommand = Tuple[List[str], Optional[Dict[str, str]], Optional[IOTracer]]
+
+T = TypeVar("T")
+
+@asynccontextmanager
+async def _off_loop(manager: ContextManager[T]) -> AsyncIterator[T]:
+    """Enter and exit a blocking context manager in a worker thread."""
+    value = await asyncio.to_thread(manager.__enter__)
+    try:
+        yield value
+    except BaseException as e:
+        if not await asyncio.to_thread(manager.__exit__, type(e), e, e.__traceback__):
+            raise
+    else:
+        await asyncio.to_thread(manager.__exit__, None, None, None)
 
 class BaseScriptChecker(ABC):
     """Abstract base class for all script checkers."""
     
-    def __init__(self, timeout: int = 60):
+    # Key into repcheck.api.LANGUAGE_CONFIG
+    language: str = ""
+    
+    def __init__(self, timeout: int = 60, trace_io: bool = False,
+                 project_root: Optional[Path] = None):
         self.timeout = timeout
+        self.trace_io = trace_io
+        # Traces are persisted under <project_root>/.repcheck (script directory if
+        # unset) unless a run passes its own trace_root
+        self.project_root = project_root
+        # Runtime read/write sets per script path, filled by traced runs
+        self.io_traces: Dict[str, Dict[str, List[Dict[str, str]]]] = {}
     
     @abstractmethod
     def find_scripts(self, root: Path, patterns: List[str], exclude: List[str]) -> List[Path]:
@@ -14,24 +47,248 @@ class BaseScriptChecker(ABC):
         pass
     
     @abstractmethod
-    def lint_script(self, path: Path) -> Dict[str, Any]:
-        """Lint a script."""
+    def lint_command(self, path: Path) -> List[str]:
+        """Build the linter command for a script."""
         pass
     
     @abstractmethod
-    def run_script(self, path: Path) -> Dict[str, Any]:
-        """Execute a script."""
+    def lint_result(self, path: Path, code: int, output: str) -> Dict[str, Any]:
+        """Turn linter exit code and output into a lint result."""
         pass
     
-    def check_script(self, path: Path, lint: bool = True) -> Dict[str, Any]:
+    def lint_error(self, path: Path, error: Exception) -> Dict[str, Any]:
+        """Lint result when the linter could not be run."""
+        return {
+            "path": str(path),
+            "lint_passed": False,
+            "lint_output": f"Linting failed: {str(error)}"
+        }
+    
+    @abstractmethod
+    def script_command(self, path: Path) -> ContextManager[ScriptCommand]:
+        """Context manager yielding how to execute a script."""
+        pass
+    
+    @abstractmethod
+    def extract_packages(self, path: Path) -> Set[str]:
+        """Statically collect the packages a script requires."""
+        pass
+    
+    @abstractmethod
+    def package_check_command(self, packages: Set[str]) -> List[str]:
+        """Build a single command that checks all packages at once."""
+        pass
+    
+    @abstractmethod
+    def parse_missing_packages(self, code: int, output: str) -> Set[str]:
+        """Parse the package check output into the set of missing packages."""
+        pass
+    
+    async def lint_script_async(self, path: Path) -> Dict[str, Any]:
+        """Lint a script (common implementation)."""
+        try:
+            code, stdout, stderr = await self._communicate(self.lint_command(path), 30)
+        except Exception as e:
+            return self.lint_error(path, e)
+        return self.lint_result(path, code, stdout + stderr)
+    
+    async def run_script_async(self, path: Path, stdout_path: Optional[Path] = None,
+                               trace_root: Optional[Path] = None) -> Dict[str, Any]:
+        """Execute a script (common implementation).
+        
+        With `stdout_path`, stdout is written to that file instead of being
+        kept in memory, and the result names it under "stdout_file".
+        `trace_root` is the project a traced run persists its trace under.
+        """
+        # Tracer setup, trace parsing and saving touch the disk, so keep them off the loop
+        async with _off_loop(self.script_command(path)) as (cmd, env, tracer):
+            result = await self._execute_async(cmd, path, env, stdout_path)
+            # A killed process (timeout or signal) never flushed its trace, so an
+            # empty one would overwrite the last complete trace
+            killed = result.get("timed_out") or result["code"] < 0
+            if tracer and not killed:
+                trace = await asyncio.to_thread(tracer.collect)
+                await asyncio.to_thread(self._store_trace, path, result, trace, trace_root)
+            return result
+    
+    async def find_missing_packages_async(self, packages: Set[str]) -> Set[str]:
+        """Return the packages that are not installed, checked in a single call."""
+        try:
+            code, stdout, _ = await self._communicate(self.package_check_command(packages), 60)
+            return self.parse_missing_packages(code, stdout)
+        except Exception:
+            # Cannot tell, let execution report the problem
+            return set()
+    
+    async def preflight_async(self, scripts: List[Path],
+                              dependency_graph: Optional[Dict[str, List[str]]] = None) -> Dict[str, List[str]]:
+        """Find scripts that cannot run because of missing packages (common implementation).
+        
+        Returns a mapping of script path to the reasons it is blocked. When a
+        dependency graph keyed by resolved paths is given, scripts depending
+        on a blocked script are blocked as well.
+        """
+        # Reads every script, so run it off the event loop
+        required = await asyncio.to_thread(
+            lambda: {str(s.resolve()): self.extract_packages(s) for s in scripts}
+        )
+        all_packages = set().union(*required.values()) if required else set()
+        missing = await self.find_missing_packages_async(all_packages) if all_packages else set()
+        return self._blocked_scripts(required, missing, dependency_graph)
+    
+    # Synchronous wrappers; these start their own event loop, so call the
+    # async variants instead when a loop is already running.
+    
+    def lint_script(self, path: Path) -> Dict[str, Any]:
+        """Lint a script (sync wrapper)."""
+        return asyncio.run(self.lint_script_async(path))
+    
+    def run_script(self, path: Path, stdout_path: Optional[Path] = None,
+                   trace_root: Optional[Path] = None) -> Dict[str, Any]:
+        """Execute a script (sync wrapper)."""
+        return asyncio.run(self.run_script_async(path, stdout_path, trace_root))
+    
+    def find_missing_packages(self, packages: Set[str]) -> Set[str]:
+        """Return the packages that are not installed (sync wrapper)."""
+        return asyncio.run(self.find_missing_packages_async(packages))
+    
+    def preflight(self, scripts: List[Path],
+                  dependency_graph: Optional[Dict[str, List[str]]] = None) -> Dict[str, List[str]]:
+        """Find scripts blocked by missing packages (sync wrapper)."""
+        return asyncio.run(self.preflight_async(scripts, dependency_graph))
+    
+    def check_script(self, path: Path, lint: bool = True, stdout_path: Optional[Path] = None,
+                     trace_root: Optional[Path] = None) -> Dict[str, Any]:
+        """Check a single script (sync wrapper)."""
+        return asyncio.run(self.check_script_async(path, lint, stdout_path, trace_root))
+    
+    def _blocked_scripts(self, required: Dict[str, Set[str]], missing: Set[str],
+                         dependency_graph: Optional[Dict[str, List[str]]]) -> Dict[str, List[str]]:
+        """Map scripts to the reasons they cannot run."""
+        blocked = {
+            path: [f"missing package '{pkg}'" for pkg in sorted(pkgs & missing)]
+            for path, pkgs in required.items() if pkgs & missing
+        }
+        
+        # Propagate to dependents until nothing changes
+        changed = dependency_graph is not None
+        while changed:
+            changed = False
+            for path, deps in dependency_graph.items():
+                if path in blocked:
+                    continue
+                blocked_deps = [d for d in deps if d in blocked]
+                if blocked_deps:
+                    blocked[path] = [f"depends on blocked {Path(d).name}" for d in sorted(blocked_deps)]
+                    changed = True
+        
+        return blocked
+    
+    def skipped_result(self, path: Path, reasons: List[str]) -> Dict[str, Any]:
+        """Result for a script that was not executed after failing pre-flight."""
+        return {
+            "path": str(path),
+            "code": None,
+            "duration": 0,
+            "stderr": "Skipped by pre-flight check: " + "; ".join(reasons),
+            "execution_passed": False,
+            "overall_passed": False,
+            "preflight_blocked": reasons
+        }
+    
+    async def _communicate(self, cmd: List[str], timeout: float, cwd: Optional[Path] = None,
+                           env: Optional[Dict[str, str]] = None,
+                           stdout_path: Optional[Path] = None) -> Tuple[int, str, str]:
+        """Run a command on the event loop, killing it on timeout or cancellation.
+        
+        With `stdout_path` the process writes stdout straight to that file and
+        the returned stdout is empty.
+        """
+        with ExitStack() as stack:
+            stdout_target = asyncio.subprocess.PIPE
+            if stdout_path is not None:
+                stdout_path.parent.mkdir(parents=True, exist_ok=True)
+                stdout_target = stack.enter_context(open(stdout_path, 'wb'))
+            proc = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=stdout_target,
+                stderr=asyncio.subprocess.PIPE,
+                cwd=cwd,
+                env=env
+            )
+            try:
+                stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout)
+            finally:
+                if proc.returncode is None:
+                    proc.kill()
+                    await proc.wait()
+        return (proc.returncode,
+                (stdout or b"").decode(errors="replace"),
+                stderr.decode(errors="replace"))
+    
+    async def _execute_async(self, cmd: List[str], path: Path,
+                             env: Optional[Dict[str, str]] = None,
+                             stdout_path: Optional[Path] = None) -> Dict[str, Any]:
+        """Run a command in the script directory (common implementation)."""
+        t0 = perf_counter()
+        
+        try:
+            code, stdout, stderr = await self._communicate(cmd, self.timeout, path.parent, env, stdout_path)
+        except asyncio.TimeoutError:
+            return {
+                "path": str(path),
+                "code": 124,
+                "duration": self.timeout,
+                "stderr": f"Timed out after {self.timeout}s",
+                "execution_passed": False,
+                "timed_out": True
+            }
+        
+        dur = perf_counter() - t0
+        result = {
+            "path": str(path),
+            "cmd": shlex.join(cmd),
+            "code": code,
+            "duration": round(dur, 3),
+            "stdout": stdout,
+            "stderr": stderr,
+            "execution_passed": code == 0
+        }
+        if stdout_path is not None:
+            result["stdout_file"] = str(stdout_path)
+        return result
+    
+    def _store_trace(self, path: Path, result: Dict[str, Any],
+                     trace: Dict[str, List[Dict[str, str]]],
+                     trace_root: Optional[Path] = None) -> Dict[str, Any]:
+        """Attach a traced run's read/write sets to its result and persist them."""
+        self.io_traces[str(path)] = trace
+        result.update(trace)
+        root = trace_root or self.project_root or path.parent
+        try:
+            result["io_trace_file"] = str(save_trace(root, path, trace))
+        except ValueError:
+            # Script outside the project; keep the trace on the result only
+            pass
+        return result
+    
+    async def check_script_async(self, path: Path, lint: bool = True,
+                                 stdout_path: Optional[Path] = None,
+                                 trace_root: Optional[Path] = None) -> Dict[str, Any]:
         """Check a single script (common implementation)."""
+        lint_result = await self.lint_script_async(path) if lint else None
+        exec_result = await self.run_script_async(path, stdout_path, trace_root)
+        return self._combine(path, lint_result, exec_result)
+    
+    def _combine(self, path: Path, lint_result: Optional[Dict[str, Any]],
+                 exec_result: Dict[str, Any]) -> Dict[str, Any]:
+        """Merge lint and execution results into one check result."""
+        lint = lint_result is not None
         result = {"path": str(path)}
         
         if lint:
-            lint_result = self.lint_script(path)
             result.update(lint_result)
         
-        exec_result = self.run_script(path)
         result.update(exec_result)
         
         if lint:
@@ -43,16 +300,18 @@ class BaseScriptChecker(ABC):
     
     def check_all(self, root: Path, patterns: List[str], exclude: List[str], 
                   lint: bool = True) -> Dict[str, Any]:
-        """Check all scripts in project (common implementation)."""
-        scripts = self.find_scripts(root, patterns, exclude)
+        """Check all scripts in project (sync wrapper around repcheck.api.check_project)."""
+        # Imported here since repcheck.api imports the language checkers
+        from repcheck.api import check_project
         
-        if not scripts:
-            return {"scripts_found": 0, "results": []}
+        async def collect():
+            return [r async for r in check_project(root, self.language, patterns=patterns,
+                                                   exclude=exclude, lint=lint, checker=self)]
+        
+        results = sorted(asyncio.run(collect()), key=lambda r: r["execution_order"])
         
-        results = []
-        for script in scripts:
-            result = self.check_script(script, lint)
-            results.append(result)
+        if not results:
+            return {"scripts_found": 0, "results": []}
         
         total = len(results)
         passed = sum(1 for r in results if r["overall_passed"])
@@ -63,4 +322,4 @@ class BaseScriptChecker(ABC):
             "results": results,
             "passed": passed,
             "failed": total - passed
-        }
\ No newline at end of file
+        }
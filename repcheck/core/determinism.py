@@ -0,0 +1,157 @@
+import os
+import asyncio
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Callable, List, Dict, Any, Optional, Set
+
+from repcheck.core.base_checker import BaseScriptChecker
+from repcheck.core.hashing import IGNORED_DIRS, hash_file, hash_output, snapshot
+from repcheck.core.io_tracer import relative_paths, traced_paths, traced_writes
+
+def traced_inputs(root: Path) -> Set[str]:
+    """Files under root that persisted traces show as read but never written."""
+    reads, writes = traced_paths(root)
+    return reads - writes
+
+def link_or_copy(root: Path, inputs: Set[str], globs: List[str]) -> Callable[[str, str], str]:
+    """copytree copy_function hardlinking read-only inputs and copying the rest.
+
+    Falls back to copying when the link fails, e.g. across filesystems or on
+    filesystems without hardlinks.
+    """
+    def copy(src: str, dst: str) -> str:
+        if os.path.relpath(src, root) in inputs or any(Path(src).match(pat) for pat in globs):
+            try:
+                os.link(src, dst)
+                return dst
+            except OSError:
+                pass
+        return shutil.copy2(src, dst)
+    return copy
+
+class DeterminismChecker:
+    """Run a project several times and report scripts whose results differ."""
+
+    def __init__(self, checker: BaseScriptChecker, jobs: Optional[int] = None):
+        self.checker = checker
+        self.jobs = jobs
+
+    async def _run_replica(self, replica_root: Path, stdout_dir: Path, patterns: Optional[List[str]],
+                           exclude: Optional[List[str]],
+                           known_writes: Dict[str, Set[str]]) -> Dict[str, Dict[str, Any]]:
+        """Run scripts one at a time inside one replica, hashing stdout and produced files.
+
+        stdout is streamed to files in `stdout_dir`, which must lie outside the
+        replica so it is not mistaken for a script output. Produced files come
+        from the write sets of this run's traces or, for untraced runs, from
+        `known_writes` (persisted traces by script); only when some script has
+        neither is the replica walked after every script.
+        """
+        # Imported here since repcheck.api imports the language checkers
+        from repcheck.api import check_project, plan_project
+
+        runs = {}
+        plan = await asyncio.to_thread(plan_project, replica_root, self.checker.language,
+                                       patterns, exclude, self.checker)
+        scripts = [os.path.relpath(p, replica_root.resolve()) for p in plan["execution_order"]]
+        use_traces = self.checker.trace_io or all(rel in known_writes for rel in scripts)
+        state = None if use_traces else await asyncio.to_thread(snapshot, replica_root)
+
+        def record(result: Dict[str, Any]) -> None:
+            nonlocal state
+            rel = str(Path(result["path"]).resolve().relative_to(replica_root.resolve()))
+            if use_traces:
+                if "io_writes" in result:
+                    writes = relative_paths(replica_root, result["io_writes"])
+                else:
+                    writes = known_writes.get(rel, set())
+                produced = sorted(p for p in writes if (replica_root / p).is_file())
+            else:
+                new_state = snapshot(replica_root)
+                produced = sorted(p for p, sig in new_state.items() if state.get(p) != sig)
+                state = new_state
+
+            # Replica paths differ between runs, so normalize them out of stdout
+            stdout_file = result.get("stdout_file")
+            runs[rel] = {
+                "code": result.get("code"),
+                "blocked": bool(result.get("preflight_blocked")),
+                "stdout": hash_output(Path(stdout_file), (str(replica_root), "<root>")) if stdout_file else None,
+                "outputs": {p: hash_file(replica_root / p) for p in produced}
+            }
+
+        async def on_finish(result: Dict[str, Any]) -> None:
+            await asyncio.to_thread(record, result)
+
+        # jobs=1 so each script's new files are attributed to it alone
+        async for _ in check_project(replica_root, self.checker.language, jobs=1,
+                                     lint=False, checker=self.checker, plan=plan, on_finish=on_finish,
+                                     stdout_dir=stdout_dir):
+            pass
+
+        return runs
+
+    async def check_async(self, root: Path, repeat: int = 2, patterns: Optional[List[str]] = None,
+                          exclude: Optional[List[str]] = None,
+                          inputs: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Run the whole project `repeat` times in isolated copies of root.
+
+        Each replica runs its scripts sequentially so upstream outputs are
+        available downstream; up to `jobs` replicas run concurrently.
+        Read-only inputs are hardlinked into the copies instead of copied:
+        files that persisted I/O traces show as read and never written, plus
+        files matching the `inputs` globs. Scripts must not modify those in place.
+        """
+        root = root.resolve()
+        limit = asyncio.Semaphore(self.jobs or repeat)
+        copy_function = link_or_copy(root, await asyncio.to_thread(traced_inputs, root), inputs or [])
+        known_writes = await asyncio.to_thread(traced_writes, root)
+
+        async def replica(i: int, tmp: str) -> Dict[str, Dict[str, Any]]:
+            async with limit:
+                replica_root = Path(tmp) / f"run{i}"
+                await asyncio.to_thread(shutil.copytree, root, replica_root, symlinks=True,
+                                        ignore=shutil.ignore_patterns(*IGNORED_DIRS),
+                                        copy_function=copy_function)
+                return await self._run_replica(replica_root, Path(tmp) / f"run{i}-stdout",
+                                               patterns, exclude, known_writes)
+
+        with tempfile.TemporaryDirectory(prefix="repcheck-repeat-") as tmp:
+            runs = await asyncio.gather(*(replica(i, tmp) for i in range(repeat)))
+
+        report = []
+        # Replicas finish scripts in execution order
+        for rel in runs[0]:
+            per_run = [run[rel] for run in runs if rel in run]
+            if any(r["blocked"] for r in per_run):
+                continue
+            outputs = sorted({p for r in per_run for p in r["outputs"]})
+            differing = [
+                p for p in outputs
+                if len({r["outputs"].get(p) for r in per_run}) > 1
+            ]
+            codes = [r["code"] for r in per_run]
+            stdout_differs = len({r["stdout"] for r in per_run}) > 1
+
+            report.append({
+                "path": str(root / rel),
+                "exit_codes": codes,
+                "stdout_differs": stdout_differs,
+                "outputs": outputs,
+                "differing_outputs": differing,
+                "deterministic": len(set(codes)) == 1 and not stdout_differs and not differing
+            })
+
+        return {
+            "root": str(root),
+            "repeat": repeat,
+            "results": report,
+            "nondeterministic": sum(1 for r in report if not r["deterministic"])
+        }
+
+    def check(self, root: Path, repeat: int = 2, patterns: Optional[List[str]] = None,
+              exclude: Optional[List[str]] = None,
+              inputs: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Run the whole project `repeat` times (sync wrapper)."""
+        return asyncio.run(self.check_async(root, repeat, patterns, exclude, inputs))
@@ -0,0 +1,165 @@
+import re
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+# Rough token estimate for prompt budgeting, no tokenizer needed
+CHARS_PER_TOKEN = 4
+
+FRAME_PATTERN = re.compile(r'^\s*File "(.+)", line (\d+)(?:, in (.+))?')
+# "ValueError: message" or a bare "KeyboardInterrupt", unindented
+EXCEPTION_PATTERN = re.compile(r'^\w[\w.]*(: |$)')
+# Continuation lines kept after the exception line; more is likely unrelated output
+MAX_MESSAGE_LINES = 10
+R_CALL_PATTERN = re.compile(r'^Error in (.+?) :')
+R_SRCREF_PATTERN = re.compile(r'\(from ([^#)]+)#(\d+)\)')
+QUOTED_PATTERN = re.compile(r"['‘`]([A-Za-z_.][\w.]*)['’`]")
+
+def _python_error(error: str) -> Tuple[List[str], List[Tuple[str, int, str]]]:
+    """Split the last Python traceback into its exception lines and frames."""
+    lines = error.splitlines()
+    starts = [i for i, line in enumerate(lines) if line.startswith("Traceback (most recent call last)")]
+    if not starts:
+        return [], []
+
+    frames = []
+    first_unindented = None
+    exception_at = None
+    for i in range(starts[-1] + 1, len(lines)):
+        line = lines[i]
+        match = FRAME_PATTERN.match(line)
+        if match:
+            following = lines[i + 1] if i + 1 < len(lines) else ""
+            is_code = following.startswith((" ", "\t")) and not FRAME_PATTERN.match(following)
+            code = following.strip() if is_code else ""
+            frames.append((match.group(1), int(match.group(2)), code))
+        elif line.strip() and not line.startswith((" ", "\t")):
+            if first_unindented is None:
+                first_unindented = i
+            # Unrelated output may be interleaved; the exception line has a known shape
+            if EXCEPTION_PATTERN.match(line):
+                exception_at = i
+                break
+
+    if exception_at is None:
+        exception_at = first_unindented
+    if exception_at is None:
+        return [], frames
+
+    # The exception line plus continuation lines of its message, up to a blank line;
+    # whatever follows is output printed after the traceback (atexit, logging, ...)
+    exception = [lines[exception_at]]
+    for line in lines[exception_at + 1:exception_at + 1 + MAX_MESSAGE_LINES]:
+        if not line.strip():
+            break
+        exception.append(line)
+
+    return exception, frames
+
+def _r_error(error: str) -> Tuple[List[str], List[Tuple[str, int, str]]]:
+    """Take the last R error block up to "Execution halted"."""
+    lines = error.splitlines()
+    starts = [i for i, line in enumerate(lines) if line.startswith("Error")]
+    if not starts:
+        return [], []
+
+    exception = []
+    for line in lines[starts[-1]:]:
+        if line.startswith("Execution halted"):
+            break
+        exception.append(line)
+
+    # Only present when the failing code was parsed with srcrefs
+    frames = [(m.group(1), int(m.group(2)), "") for m in R_SRCREF_PATTERN.finditer("\n".join(exception))]
+    return exception, frames
+
+def _locate_r_error(exception: List[str], source: List[str]) -> List[int]:
+    """Find script lines that likely raised an R error, by call text or quoted names."""
+    needles = []
+    call = R_CALL_PATTERN.match(exception[0])
+    if call:
+        needles.append(call.group(1))
+    needles.extend(QUOTED_PATTERN.findall("\n".join(exception)))
+
+    for needle in needles:
+        hits = [i + 1 for i, line in enumerate(source)
+                if needle in line.split("#")[0]]
+        if hits:
+            return hits[:3]
+    return []
+
+def _source_excerpt(source: List[str], line_numbers: List[int], context: int = 2) -> List[str]:
+    """Numbered source lines around each failing line, marking the failing ones."""
+    shown = sorted({
+        n for line in line_numbers
+        for n in range(max(1, line - context), min(len(source), line + context) + 1)
+    })
+    excerpt = []
+    for n in shown:
+        if excerpt and n != prev + 1:
+            excerpt.append("     ...")
+        marker = ">" if n in line_numbers else " "
+        excerpt.append(f"{marker}{n:4d} | {source[n - 1]}")
+        prev = n
+    return excerpt
+
+def _clip(text: str, budget: int) -> str:
+    return text if len(text) <= budget else text[:max(budget - 15, 0)] + "\n[...truncated]"
+
+def extract_error_context(error: str, script_path: str, language: str = "R",
+                          max_tokens: int = 512) -> str:
+    """Reduce raw stderr to the final error, the failing source lines and the
+    innermost traceback frames, within roughly `max_tokens` tokens.
+
+    Falls back to the tail of stderr when no error block is recognized.
+    """
+    budget = max_tokens * CHARS_PER_TOKEN
+    script = Path(script_path)
+
+    if language.lower() == "python":
+        exception, frames = _python_error(error)
+    else:
+        exception, frames = _r_error(error)
+
+    if not exception:
+        error = error.strip()
+        return error if len(error) <= budget else "[...truncated]\n" + error[-budget:]
+
+    try:
+        source: Optional[List[str]] = script.read_text(encoding="utf-8", errors="replace").splitlines()
+    except OSError:
+        source = None
+
+    # The error itself comes first, so keep the head when the block is long
+    sections = [("Final error", _clip("\n".join(exception[:20]), budget))]
+
+    if source:
+        line_numbers = [n for f, n, _ in frames if Path(f).name == script.name]
+        if not line_numbers and language.lower() != "python":
+            line_numbers = _locate_r_error(exception, source)
+        if line_numbers:
+            excerpt = _source_excerpt(source, line_numbers[-3:])
+            sections.append((f"Failing lines in {script.name}", "\n".join(excerpt)))
+
+    if frames:
+        # Innermost frames are the most relevant, so keep those when trimming
+        frame_lines = [f"{Path(f).name}:{n}  {code}".rstrip() for f, n, code in frames]
+        sections.append(("Traceback (innermost last)", "\n".join(frame_lines)))
+
+    context = []
+    remaining = budget
+    for title, body in sections:
+        block = f"{title}:\n{body}"
+        if len(block) > remaining:
+            if title.startswith("Traceback"):
+                kept = body.splitlines()
+                while kept and len(title) + 2 + len("\n".join(kept)) > remaining:
+                    kept.pop(0)
+                if kept:
+                    context.append(f"{title}:\n" + "\n".join(kept))
+            elif remaining > len(title) + 20:
+                context.append(f"{title}:\n" + _clip(body, remaining - len(title) - 2))
+            break
+        context.append(block)
+        remaining -= len(block) + 2
+
+    return "\n\n".join(context)
@@ -0,0 +1,57 @@
+import os
+import hashlib
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+HASH_ALGORITHM = "blake2b"
+
+# Per-project directory for repcheck state (manifests, I/O traces)
+REPCHECK_DIR = ".repcheck"
+
+# Directories that hold caches or repcheck state rather than script outputs
+IGNORED_DIRS = {"__pycache__", ".git", ".Rproj.user", ".ipynb_checkpoints", REPCHECK_DIR}
+
+def hash_file(path: Path) -> str:
+    """Hash a file in fixed-size chunks so memory use does not grow with file size."""
+    with open(path, 'rb') as f:
+        return hashlib.file_digest(f, HASH_ALGORITHM).hexdigest()
+
+def hash_output(path: Path, replace: Optional[Tuple[str, str]] = None,
+                chunk_size: int = 1 << 20) -> str:
+    """Hash captured process output in chunks, replacing `replace[0]` with `replace[1]`.
+
+    The replacement normalizes e.g. a temporary directory out of the output;
+    the last len(old) - 1 bytes of each chunk are held back so a match split
+    across two chunks is still replaced.
+    """
+    if not replace or not replace[0]:
+        return hash_file(path)
+
+    old, new = (s.encode('utf-8', errors='surrogateescape') for s in replace)
+    keep = len(old) - 1
+    h = hashlib.new(HASH_ALGORITHM)
+    pending = b""
+    with open(path, 'rb') as f:
+        while chunk := f.read(chunk_size):
+            head, sep, tail = (pending + chunk).rpartition(old)
+            if sep:
+                h.update(head.replace(old, new) + new)
+            cut = max(len(tail) - keep, 0)
+            h.update(tail[:cut])
+            pending = tail[cut:]
+    h.update(pending)
+    return h.hexdigest()
+
+def snapshot(root: Path) -> Dict[str, Tuple[int, int]]:
+    """Map every file under root (relative path) to its (size, mtime_ns)."""
+    state = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in IGNORED_DIRS]
+        for fn in filenames:
+            p = os.path.join(dirpath, fn)
+            try:
+                st = os.stat(p)
+            except OSError:
+                continue
+            state[os.path.relpath(p, root)] = (st.st_size, st.st_mtime_ns)
+    return state
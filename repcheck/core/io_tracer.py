@@ -0,0 +1,134 @@
+import os
+import json
+import tempfile
+from pathlib import Path
+from typing import List, Dict, Any, Set, Tuple
+
+from repcheck.core.hashing import REPCHECK_DIR
+
+TRACE_FILE_ENV = "REPCHECK_TRACE_FILE"
+TRACE_ROOT_ENV = "REPCHECK_TRACE_ROOT"
+
+# Persisted read/write sets live in <project>/.repcheck/io_traces/<script path>.json
+TRACE_DIR = "io_traces"
+
+def _outside(rel: str) -> bool:
+    return rel == os.pardir or rel.startswith(os.pardir + os.sep) or os.path.isabs(rel)
+
+def trace_path(project_root: Path, script_path: Path) -> Path:
+    """Where the persisted trace of a script is stored.
+
+    Raises ValueError for scripts outside project_root, whose trace would
+    otherwise land outside the trace directory.
+    """
+    rel = os.path.relpath(script_path.resolve(), project_root.resolve())
+    if _outside(rel):
+        raise ValueError(f"{script_path} is outside {project_root}")
+    return project_root / REPCHECK_DIR / TRACE_DIR / f"{rel}.json"
+
+def save_trace(project_root: Path, script_path: Path, trace: Dict[str, Any]) -> Path:
+    """Persist a script's read/write sets, replacing the previous trace."""
+    out = trace_path(project_root, script_path)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with open(out, 'w', encoding='utf-8') as f:
+        json.dump({"script": str(script_path.resolve()), **trace}, f, indent=1)
+    return out
+
+def load_traces(project_root: Path) -> Dict[str, Dict[str, Any]]:
+    """Load all persisted traces of a project, keyed by resolved script path."""
+    traces = {}
+    trace_dir = project_root / REPCHECK_DIR / TRACE_DIR
+    for trace_file in sorted(trace_dir.rglob("*.json")) if trace_dir.is_dir() else []:
+        try:
+            with open(trace_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if not isinstance(data, dict) or "script" not in data:
+            continue
+        traces[data.pop("script")] = data
+    return traces
+
+def relative_paths(project_root: Path, entries: List[Dict[str, str]]) -> Set[str]:
+    """Paths of trace entries relative to project_root, leaving out files outside it."""
+    root = project_root.resolve()
+    rels = (os.path.relpath(entry["path"], root) for entry in entries)
+    return {rel for rel in rels if not _outside(rel)}
+
+def traced_paths(project_root: Path) -> Tuple[Set[str], Set[str]]:
+    """Files under project_root that persisted traces show as read and as written.
+
+    Paths are relative to project_root; files outside it are left out.
+    """
+    reads, writes = set(), set()
+    for trace in load_traces(project_root).values():
+        reads |= relative_paths(project_root, trace.get("io_reads", []))
+        writes |= relative_paths(project_root, trace.get("io_writes", []))
+    return reads, writes
+
+def traced_writes(project_root: Path) -> Dict[str, Set[str]]:
+    """Write set of each traced script, both keyed and listed relative to project_root."""
+    root = project_root.resolve()
+    writes = {}
+    for script, trace in load_traces(project_root).items():
+        rel = os.path.relpath(script, root)
+        if not _outside(rel):
+            writes[rel] = relative_paths(project_root, trace.get("io_writes", []))
+    return writes
+
+class IOTracer:
+    """Inject a language-specific startup hook and collect the files a script touches.
+
+    The hook appends one ``kind<TAB>path<TAB>origin`` line per distinct
+    (kind, path) pair to the file named by ``REPCHECK_TRACE_FILE`` when the
+    traced process exits, so the per-call overhead is a set lookup.
+    """
+
+    def __init__(self, hook_name: str, hook_source: str):
+        self.hook_name = hook_name
+        self.hook_source = hook_source
+        self._tmp = None
+        self.script = None
+
+    def __enter__(self) -> "IOTracer":
+        self._tmp = tempfile.TemporaryDirectory(prefix="repcheck-trace-")
+        self.dir = Path(self._tmp.name)
+        self.hook_path = self.dir / self.hook_name
+        self.hook_path.write_text(self.hook_source, encoding="utf-8")
+        self.trace_file = self.dir / "trace.tsv"
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._tmp.cleanup()
+
+    def env(self, script_path: Path, **extra: str) -> Dict[str, str]:
+        """Build the subprocess environment for a traced run."""
+        env = os.environ.copy()
+        env[TRACE_FILE_ENV] = str(self.trace_file)
+        env[TRACE_ROOT_ENV] = str(script_path.parent.resolve())
+        self.script = os.path.normpath(script_path.resolve())
+        env.update(extra)
+        return env
+
+    def collect(self) -> Dict[str, List[Dict[str, str]]]:
+        """Parse the trace file into sorted read and write sets."""
+        sets: Dict[str, Dict[str, str]] = {"read": {}, "write": {}}
+
+        if self.trace_file.exists():
+            with open(self.trace_file, 'r', encoding='utf-8', errors='replace') as f:
+                for line in f:
+                    parts = line.rstrip("\n").split("\t")
+                    if len(parts) < 2 or parts[0] not in sets:
+                        continue
+                    path = os.path.normpath(parts[1])
+                    # The interpreter opening the script itself is not an input
+                    if parts[0] == "read" and path == self.script:
+                        continue
+                    origin = parts[2] if len(parts) > 2 else ""
+                    # Child processes append their own records; keep the first origin
+                    sets[parts[0]].setdefault(path, origin)
+
+        return {
+            "io_reads": [{"path": p, "origin": o} for p, o in sorted(sets["read"].items())],
+            "io_writes": [{"path": p, "origin": o} for p, o in sorted(sets["write"].items())]
+        }
@@ -1,12 +1,17 @@
 import requests
 from typing import Optional
 
+from repcheck.core.error_context import extract_error_context
+
 class OllamaHandler:
     """Simple OLLAMA handler for error analysis."""
     
-    def __init__(self, model: str = "granite3.3:2b", base_url: str = "http://localhost:11434"):
+    def __init__(self, model: str = "granite3.3:2b", base_url: str = "http://localhost:11434",
+                 max_context_tokens: int = 512):
         self.model = model
         self.api_url = f"{base_url}/api/generate"
+        # Token budget for the error context sent with each prompt
+        self.max_context_tokens = max_context_tokens
     
     def is_available(self) -> bool:
         """Check if OLLAMA is running."""
@@ -44,10 +49,11 @@ class OllamaHandler:
     
     def analyze_error(self, script_path: str, error: str, language: str = "R") -> Optional[str]:
         """Analyze script error for any programming language."""
+        context = extract_error_context(error, script_path, language, self.max_context_tokens)
         prompt = f"""You are a {language} programming expert. Analyze this error and explain the likely cause and how to fix it.
 
 Script: {script_path}
-Error: {error}
+{context}
 
 Keep response under 100 words."""
         
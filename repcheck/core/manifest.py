@@ -0,0 +1,216 @@
+import csv
+import json
+import math
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterable, List, Dict, Any, Optional
+
+from repcheck.core.hashing import HASH_ALGORITHM, REPCHECK_DIR, hash_file, snapshot
+from repcheck.core.io_tracer import traced_paths
+
+MANIFEST_DIR = REPCHECK_DIR
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 2
+BASELINE_DIR = "baseline"
+# Touched before verify re-runs scripts; outputs older than it were not regenerated
+RUN_MARKER = "run-started"
+
+# Tolerant comparison hooks by file suffix: (baseline, current, rtol, atol) -> equal
+Comparator = Callable[[Path, Path, float, float], bool]
+COMPARATORS: Dict[str, Comparator] = {}
+
+def register_comparator(suffix: str, comparator: Comparator) -> None:
+    """Register a tolerant comparison hook for files with the given suffix."""
+    COMPARATORS[suffix.lower()] = comparator
+
+def _cells_close(a: str, b: str, rtol: float, atol: float) -> bool:
+    if a == b:
+        return True
+    try:
+        return math.isclose(float(a), float(b), rel_tol=rtol, abs_tol=atol)
+    except ValueError:
+        return False
+
+def _compare_table(delimiter: str) -> Comparator:
+    def compare(baseline: Path, current: Path, rtol: float, atol: float) -> bool:
+        with open(baseline, newline='', encoding='utf-8', errors='replace') as fb, \
+             open(current, newline='', encoding='utf-8', errors='replace') as fc:
+            rows_b = csv.reader(fb, delimiter=delimiter)
+            rows_c = csv.reader(fc, delimiter=delimiter)
+            for row_b in rows_b:
+                row_c = next(rows_c, None)
+                if row_c is None or len(row_b) != len(row_c):
+                    return False
+                if not all(_cells_close(a, b, rtol, atol) for a, b in zip(row_b, row_c)):
+                    return False
+            return next(rows_c, None) is None
+    return compare
+
+register_comparator(".csv", _compare_table(","))
+register_comparator(".tsv", _compare_table("\t"))
+
+class OutputManifest:
+    """Record output files of a project and verify a fresh run against them.
+
+    Outputs are the files matching the `outputs` globs plus the files that
+    persisted I/O traces (``check --trace-io``) show a script writing.
+    """
+
+    def __init__(self, root: Path, exclude: List[str], jobs: Optional[int] = None,
+                 outputs: Optional[List[str]] = None):
+        self.root = root.resolve()
+        self.exclude = exclude
+        self.jobs = jobs
+        self.outputs = outputs or []
+        self.manifest_dir = self.root / MANIFEST_DIR
+        self.manifest_path = self.manifest_dir / MANIFEST_NAME
+
+    def _scan(self, outputs: List[str], known: Iterable[str] = ()) -> Dict[str, tuple]:
+        """Current (size, mtime_ns) of every output file.
+
+        `known` adds files tracked regardless of globs and traces, e.g. the
+        files of a baseline being verified.
+        """
+        tracked = traced_paths(self.root)[1] | set(known)
+        return {
+            rel: sig for rel, sig in snapshot(self.root).items()
+            if (rel in tracked or any((self.root / rel).match(pat) for pat in outputs))
+            and not any((self.root / rel).match(pat) for pat in self.exclude)
+        }
+
+    def _hash_all(self, rels: List[str]) -> Dict[str, str]:
+        """Hash files in parallel; hashlib releases the GIL while digesting."""
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            return dict(zip(rels, pool.map(lambda rel: hash_file(self.root / rel), rels)))
+
+    def build(self, previous: Optional[Dict[str, Dict[str, Any]]] = None,
+              outputs: Optional[List[str]] = None,
+              known: Iterable[str] = ()) -> Dict[str, Dict[str, Any]]:
+        """Build manifest entries, reusing hashes of files whose size and mtime are unchanged."""
+        previous = previous or {}
+        state = self._scan(self.outputs if outputs is None else outputs, known)
+        entries = {}
+        to_hash = []
+
+        for rel, (size, mtime_ns) in state.items():
+            old = previous.get(rel)
+            if old and old["size"] == size and old["mtime_ns"] == mtime_ns:
+                entries[rel] = old
+            else:
+                to_hash.append(rel)
+
+        for rel, digest in self._hash_all(to_hash).items():
+            size, mtime_ns = state[rel]
+            entries[rel] = {"size": size, "mtime_ns": mtime_ns, "hash": digest}
+
+        return dict(sorted(entries.items()))
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """Load the saved manifest, if any.
+
+        Returns the whole manifest: "files" holds the entries and "outputs"
+        the globs they were recorded with.
+        """
+        if not self.manifest_path.exists():
+            return None
+        with open(self.manifest_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get("version") != MANIFEST_VERSION or data.get("algorithm") != HASH_ALGORITHM:
+            return None
+        return data
+
+    def snapshot(self, language: Optional[str] = None,
+                 patterns: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Write the manifest, keeping baseline copies of outputs with a tolerant comparator.
+
+        `language` and custom script `patterns` are stored so verify re-runs
+        the same scripts. Raises ValueError when there is nothing to record:
+        no `outputs` globs were given and no traced run recorded any writes.
+        """
+        loaded = self.load()
+        previous = loaded["files"] if loaded else {}
+        entries = self.build(previous)
+        if not entries and not self.outputs and not traced_paths(self.root)[1]:
+            raise ValueError("No outputs to record: pass output globs or run a traced check first")
+
+        # Tolerant comparison needs the baseline content, which a fresh run overwrites
+        baseline_dir = self.manifest_dir / BASELINE_DIR
+        for rel, entry in entries.items():
+            if Path(rel).suffix.lower() not in COMPARATORS:
+                continue
+            copy = baseline_dir / rel
+            if copy.exists() and previous.get(rel, {}).get("hash") == entry["hash"]:
+                continue
+            copy.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(self.root / rel, copy)
+
+        # Drop copies of files that are no longer tracked
+        for copy in list(baseline_dir.rglob("*")) if baseline_dir.is_dir() else []:
+            if copy.is_file() and str(copy.relative_to(baseline_dir)) not in entries:
+                copy.unlink()
+
+        self.manifest_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.manifest_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                "version": MANIFEST_VERSION,
+                "algorithm": HASH_ALGORITHM,
+                "language": language,
+                "patterns": patterns,
+                "outputs": self.outputs,
+                "files": entries
+            }, f, indent=1)
+
+        return {
+            "manifest": str(self.manifest_path),
+            "files": len(entries),
+            "hashed": sum(1 for rel, e in entries.items() if previous.get(rel) is not e)
+        }
+
+    def mark_run_start(self) -> int:
+        """Touch the run marker and return its mtime, taken from the filesystem clock."""
+        marker = self.manifest_dir / RUN_MARKER
+        self.manifest_dir.mkdir(parents=True, exist_ok=True)
+        marker.write_bytes(b"")
+        return marker.stat().st_mtime_ns
+
+    def verify(self, manifest: Dict[str, Any], rtol: float = 1e-9,
+               atol: float = 0.0, since: Optional[int] = None) -> Dict[str, Any]:
+        """Compare the current outputs with a manifest from load().
+
+        The outputs are found with the manifest's own globs. Only files whose
+        size or mtime changed since the baseline are hashed. With `since`
+        (from mark_run_start), files last written before the run are reported
+        as stale instead of matched, since the run did not regenerate them.
+        """
+        baseline = manifest["files"]
+        current = self.build(baseline, manifest.get("outputs", []), baseline)
+        report = {"matched": [], "within_tolerance": [], "differs": [], "missing": [],
+                  "stale": [], "new": []}
+
+        for rel, entry in baseline.items():
+            now = current.get(rel)
+            if now is None:
+                report["missing"].append(rel)
+            elif since is not None and now["mtime_ns"] < since:
+                report["stale"].append(rel)
+            elif now["hash"] == entry["hash"]:
+                report["matched"].append(rel)
+            elif self._tolerant_equal(rel, rtol, atol):
+                report["within_tolerance"].append(rel)
+            else:
+                report["differs"].append(rel)
+
+        report["new"] = sorted(set(current) - set(baseline))
+        report["passed"] = not report["differs"] and not report["missing"] and not report["stale"]
+        return report
+
+    def _tolerant_equal(self, rel: str, rtol: float, atol: float) -> bool:
+        comparator = COMPARATORS.get(Path(rel).suffix.lower())
+        baseline_copy = self.manifest_dir / BASELINE_DIR / rel
+        if comparator is None or not baseline_copy.exists():
+            return False
+        try:
+            return comparator(baseline_copy, self.root / rel, rtol, atol)
+        except Exception:
+            return False
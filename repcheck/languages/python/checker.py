@@ -1,15 +1,19 @@
 import os
-import shlex
-import subprocess
+import ast
+import json
+from contextlib import contextmanager
 from pathlib import Path
-from time import perf_counter
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Set, Iterator
 
-from repcheck.core.base_checker import BaseScriptChecker
+from repcheck.core.base_checker import BaseScriptChecker, ScriptCommand
+from repcheck.core.io_tracer import IOTracer
+from repcheck.languages.python.tracer import SITECUSTOMIZE
 
 class PythonScriptChecker(BaseScriptChecker):
     """Python script checker with linting and execution."""
     
+    language = "python"
+    
     def find_scripts(self, root: Path, patterns: List[str], exclude: List[str]) -> List[Path]:
         """Find Python scripts matching patterns."""
         found: List[Path] = []
@@ -23,64 +27,80 @@ class PythonScriptChecker(BaseScriptChecker):
                 found.append(p)
         return sorted(found)
     
-    def lint_script(self, path: Path) -> Dict[str, Any]:
+    def lint_command(self, path: Path) -> List[str]:
         """Lint Python script using flake8."""
-        try:
-            result = subprocess.run(
-                ['flake8', str(path), '--max-line-length=100'], 
-                capture_output=True, text=True, timeout=30
-            )
-            
-            return {
-                "path": str(path),
-                "lint_passed": result.returncode == 0,
-                "lint_output": result.stdout + result.stderr if result.returncode != 0 else "No linting issues found"
-            }
-        except FileNotFoundError:
-            # flake8 not installed, skip linting
+        return ['flake8', str(path), '--max-line-length=100']
+    
+    def lint_result(self, path: Path, code: int, output: str) -> Dict[str, Any]:
+        """Interpret flake8 exit code and output."""
+        return {
+            "path": str(path),
+            "lint_passed": code == 0,
+            "lint_output": output if code != 0 else "No linting issues found"
+        }
+    
+    def lint_error(self, path: Path, error: Exception) -> Dict[str, Any]:
+        """Skip linting when flake8 is not installed."""
+        if isinstance(error, FileNotFoundError):
             return {
                 "path": str(path),
                 "lint_passed": True,
                 "lint_output": "flake8 not available, skipping lint"
             }
-        except Exception as e:
-            return {
-                "path": str(path),
-                "lint_passed": False,
-                "lint_output": f"Linting failed: {str(e)}"
-            }
+        return super().lint_error(path, error)
     
-    def run_script(self, path: Path) -> Dict[str, Any]:
-        """Execute Python script and return results."""
-        script_dir = path.parent
-        script_name = path.name
+    @contextmanager
+    def script_command(self, path: Path) -> Iterator[ScriptCommand]:
+        """Execute Python script, injecting the I/O tracing hook when enabled."""
+        cmd = ["python3", path.name]
+        
+        if not self.trace_io:
+            yield cmd, None, None
+            return
         
-        cmd = ["python3", script_name]
-        t0 = perf_counter()
+        # Inject an audit hook through sitecustomize to record file I/O
+        with IOTracer("sitecustomize.py", SITECUSTOMIZE) as tracer:
+            pythonpath = [str(tracer.dir)]
+            if os.environ.get("PYTHONPATH"):
+                pythonpath.append(os.environ["PYTHONPATH"])
+            yield cmd, tracer.env(path, PYTHONPATH=os.pathsep.join(pythonpath)), tracer
+    
+    def extract_packages(self, path: Path) -> Set[str]:
+        """Collect top-level imports that are not local modules."""
+        packages = set()
         
         try:
-            res = subprocess.run(
-                cmd, 
-                capture_output=True, 
-                text=True, 
-                timeout=self.timeout,
-                cwd=script_dir
-            )
-            dur = perf_counter() - t0
-            return {
-                "path": str(path),
-                "cmd": shlex.join(cmd),
-                "code": res.returncode,
-                "duration": round(dur, 3),
-                "stdout": res.stdout,
-                "stderr": res.stderr,
-                "execution_passed": res.returncode == 0
-            }
-        except subprocess.TimeoutExpired:
-            return {
-                "path": str(path),
-                "code": 124,
-                "duration": self.timeout,
-                "stderr": f"Timed out after {self.timeout}s",
-                "execution_passed": False
-            }
\ No newline at end of file
+            with open(path, 'r', encoding='utf-8') as f:
+                tree = ast.parse(f.read())
+        except Exception:
+            return packages
+        
+        # Only module-level statements: imports inside functions or
+        # try/except blocks are usually optional
+        for node in tree.body:
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+                names = [node.module]
+            else:
+                continue
+            
+            for name in names:
+                top = name.split('.')[0]
+                if (path.parent / f"{top}.py").exists() or (path.parent / top).is_dir():
+                    continue
+                packages.add(top)
+        
+        return packages
+    
+    def package_check_command(self, packages: Set[str]) -> List[str]:
+        """Check all packages with one importlib.util.find_spec sweep."""
+        sweep = (
+            "import importlib.util, json, sys\n"
+            "print(json.dumps([p for p in sys.argv[1:] if importlib.util.find_spec(p) is None]))"
+        )
+        return ['python3', '-c', sweep, *sorted(packages)]
+    
+    def parse_missing_packages(self, code: int, output: str) -> Set[str]:
+        """Read the JSON list printed by the sweep."""
+        return set(json.loads(output))
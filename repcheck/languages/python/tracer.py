@@ -0,0 +1,95 @@
+"""Startup hook injected as ``sitecustomize`` into traced Python runs."""
+
+SITECUSTOMIZE = r'''
+import atexit
+import importlib.machinery
+import importlib.util
+import os
+import site
+import sys
+
+_trace_file = os.environ.get("REPCHECK_TRACE_FILE")
+_root = os.path.join(os.environ.get("REPCHECK_TRACE_ROOT", ""), "")
+_here = os.path.dirname(os.path.abspath(__file__))
+_ignore = tuple(os.path.join(p, "") for p in {
+    sys.prefix, sys.base_prefix, sys.exec_prefix, _here, site.getusersitepackages()
+} if p)
+_write_flags = os.O_WRONLY | os.O_RDWR | os.O_APPEND | os.O_CREAT | os.O_TRUNC
+_seen = {}
+_skip = set()
+
+# Keep the hook directory out of the traced script's import path
+sys.path[:] = [p for p in sys.path if os.path.abspath(p or ".") != _here]
+
+
+def _origin():
+    frame = sys._getframe(2)
+    while frame is not None:
+        name = frame.f_code.co_filename
+        if name.startswith(_root):
+            return "%s:%d" % (os.path.basename(name), frame.f_lineno)
+        frame = frame.f_back
+    return ""
+
+
+def _record(kind, path):
+    if path is None or isinstance(path, int):
+        return
+    path = os.path.abspath(os.fsdecode(path))
+    if path.startswith(_ignore) or path.endswith(".pyc") or path in _skip:
+        return
+    if (kind, path) not in _seen:
+        _seen[(kind, path)] = _origin()
+
+
+def _hook(event, args):
+    if event == "open":
+        path, mode, flags = args
+        if mode is None:
+            reads = not flags & os.O_WRONLY
+            writes = bool(flags & _write_flags)
+        else:
+            reads = "r" in mode or "+" in mode
+            writes = any(c in mode for c in "wax+")
+        if reads:
+            _record("read", path)
+        if writes:
+            _record("write", path)
+    elif event == "os.rename":
+        _record("read", args[0])
+        _record("write", args[1])
+    elif event == "os.remove":
+        _record("write", args[0])
+
+
+def _flush():
+    lines = [
+        "%s\t%s\t%s\n" % (kind, path.replace("\t", " "), origin)
+        for (kind, path), origin in _seen.items()
+    ]
+    _seen.clear()
+    if lines:
+        with open(_trace_file, "a", encoding="utf-8") as f:
+            f.writelines(lines)
+
+
+def _chain_original():
+    # This file shadows any sitecustomize further down sys.path (distro, venv,
+    # coverage); run that one too so traced runs behave like untraced ones.
+    spec = importlib.machinery.PathFinder.find_spec("sitecustomize", sys.path)
+    if spec is None or spec.origin is None:
+        return
+    if os.path.dirname(os.path.abspath(spec.origin)) == _here:
+        return
+    _skip.add(os.path.abspath(spec.origin))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["sitecustomize"] = module
+    spec.loader.exec_module(module)
+
+
+if _trace_file:
+    sys.addaudithook(_hook)
+    atexit.register(_flush)
+
+_chain_original()
+'''
@@ -1,15 +1,55 @@
 import os
-import shlex
-import subprocess
+import re
+from contextlib import contextmanager
 from pathlib import Path
-from time import perf_counter
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Set, Iterator
 
-from repcheck.core.base_checker import BaseScriptChecker
+from repcheck.core.base_checker import BaseScriptChecker, ScriptCommand
+from repcheck.core.io_tracer import IOTracer
+from repcheck.languages.r.tracer import RPROFILE
+
+# library(pkg) anywhere, and require(pkg) only as a statement of its own:
+# require() used as a condition (if (require(x)), !require(x)) is an optional
+# package guard, just like requireNamespace(), which is left out entirely
+LIBRARY_PATTERN = re.compile(r'\blibrary\s*\(([^()]*)\)')
+REQUIRE_PATTERN = re.compile(
+    r'(?:^|;)\s*(?:suppress\w*\(\s*)?require\s*\(([^()]*)\)', re.MULTILINE
+)
+PACKAGE_ARG_PATTERN = re.compile(r'^(?:package\s*=\s*)?(["\']?)([A-Za-z][A-Za-z0-9.]*)\1$')
+NAMESPACE_PATTERN = re.compile(r'\b([A-Za-z][A-Za-z0-9.]*):::?[A-Za-z.`]')
+# String literals (raw strings first) and comments, scanned left to right so a
+# "#" inside a string or a quote inside a comment is not mistaken for the other
+CODE_NOISE_PATTERN = re.compile(
+    r'(?<![\w.])[rR](["\'])(-*)[(\[{].*?[)\]}]\2\1'
+    r'|"(?:[^"\\]|\\.)*"'
+    r"|'(?:[^'\\]|\\.)*'"
+    r'|`[^`]*`'
+    r'|#[^\n]*',
+    re.DOTALL
+)
+PACKAGE_NAME_PATTERN = re.compile(r'[A-Za-z][A-Za-z0-9.]*')
+
+def _strip_code_noise(content: str) -> str:
+    """Blank out comments and string literals, keeping line breaks.
+
+    Strings that are a bare package name are kept, since library("pkg") needs
+    them; backtick names are code and stay as they are.
+    """
+    def blank(match: re.Match) -> str:
+        text = match.group(0)
+        if text[0] == '`':
+            return text
+        if text[0] in '"\'' and PACKAGE_NAME_PATTERN.fullmatch(text[1:-1]):
+            return text
+        kept = '""' if text[0] != '#' else ''
+        return kept + '\n' * text.count('\n')
+    return CODE_NOISE_PATTERN.sub(blank, content)
 
 class RScriptChecker(BaseScriptChecker):
     """R script checker with linting and execution."""
     
+    language = "r"
+    
     def find_scripts(self, root: Path, patterns: List[str], exclude: List[str]) -> List[Path]:
         """Find R scripts matching patterns."""
         found: List[Path] = []
@@ -23,7 +63,7 @@ class RScriptChecker(BaseScriptChecker):
                 found.append(p)
         return sorted(found)
     
-    def lint_script(self, path: Path) -> Dict[str, Any]:
+    def lint_command(self, path: Path) -> List[str]:
         """Lint R script using lintr package."""
         r_cmd = f'''
         if (requireNamespace("lintr", quietly = TRUE)) {{
@@ -38,56 +78,55 @@ class RScriptChecker(BaseScriptChecker):
             cat("lintr package not available\\n")
         }}
         '''
-        
-        try:
-            result = subprocess.run(
-                ['Rscript', '-e', r_cmd], 
-                capture_output=True, text=True, timeout=30
-            )
-            
-            return {
-                "path": str(path),
-                "lint_passed": result.returncode == 0,
-                "lint_output": result.stdout + result.stderr
-            }
-        except Exception as e:
-            return {
-                "path": str(path),
-                "lint_passed": False,
-                "lint_output": f"Linting failed: {str(e)}"
-            }
+        return ['Rscript', '-e', r_cmd]
     
-    def run_script(self, path: Path) -> Dict[str, Any]:
-        """Execute R script and return results."""
-        script_dir = path.parent
-        script_name = path.name
-        
-        cmd = ["Rscript", "--vanilla", script_name]
-        t0 = perf_counter()
+    def lint_result(self, path: Path, code: int, output: str) -> Dict[str, Any]:
+        """Interpret lintr exit code and output."""
+        return {
+            "path": str(path),
+            "lint_passed": code == 0,
+            "lint_output": output
+        }
+    
+    @contextmanager
+    def script_command(self, path: Path) -> Iterator[ScriptCommand]:
+        """Execute R script, injecting the I/O tracing profile when enabled."""
+        if not self.trace_io:
+            yield ["Rscript", "--vanilla", path.name], None, None
+            return
         
+        # --vanilla minus --no-site-file, so R_PROFILE can install the tracing profile
+        cmd = ["Rscript", "--no-save", "--no-restore", "--no-init-file", "--no-environ", path.name]
+        with IOTracer("tracer.R", RPROFILE) as tracer:
+            yield cmd, tracer.env(path, R_PROFILE=str(tracer.hook_path)), tracer
+    
+    def extract_packages(self, path: Path) -> Set[str]:
+        """Collect packages used via library(), require() and pkg:: calls."""
         try:
-            res = subprocess.run(
-                cmd, 
-                capture_output=True, 
-                text=True, 
-                timeout=self.timeout,
-                cwd=script_dir
-            )
-            dur = perf_counter() - t0
-            return {
-                "path": str(path),
-                "cmd": shlex.join(cmd),
-                "code": res.returncode,
-                "duration": round(dur, 3),
-                "stdout": res.stdout,
-                "stderr": res.stderr,
-                "execution_passed": res.returncode == 0
-            }
-        except subprocess.TimeoutExpired:
-            return {
-                "path": str(path),
-                "code": 124,
-                "duration": self.timeout,
-                "stderr": f"Timed out after {self.timeout}s",
-                "execution_passed": False
-            }
\ No newline at end of file
+            with open(path, 'r', encoding='utf-8') as f:
+                content = f.read()
+        except Exception:
+            return set()
+        
+        # Package names in comments or embedded code (e.g. C++ std::) are not dependencies
+        content = _strip_code_noise(content)
+        packages = set(NAMESPACE_PATTERN.findall(content))
+        for args in LIBRARY_PATTERN.findall(content) + REQUIRE_PATTERN.findall(content):
+            # library(p, character.only = TRUE) names a variable, not a package
+            if "character.only" in args:
+                continue
+            match = PACKAGE_ARG_PATTERN.match(args.split(",")[0].strip())
+            if match:
+                packages.add(match.group(2))
+        return packages
+    
+    def package_check_command(self, packages: Set[str]) -> List[str]:
+        """Check all packages against installed.packages() in one Rscript call."""
+        r_cmd = 'cat(setdiff(commandArgs(trailingOnly = TRUE), rownames(installed.packages())), sep = "\\n")'
+        return ['Rscript', '--vanilla', '-e', r_cmd, *sorted(packages)]
+    
+    def parse_missing_packages(self, code: int, output: str) -> Set[str]:
+        """Read one missing package per line."""
+        if code != 0:
+            return set()
+        return {line.strip() for line in output.splitlines() if line.strip()}
@@ -0,0 +1,82 @@
+"""Startup profile injected as ``R_PROFILE`` into traced R runs."""
+
+RPROFILE = r'''
+local({
+  trace_file <- Sys.getenv("REPCHECK_TRACE_FILE")
+  if (nzchar(trace_file)) {
+    seen <- new.env(hash = TRUE, parent = emptyenv())
+    busy <- FALSE
+
+    # Line numbers are only available for code parsed with srcrefs (source()d files)
+    options(keep.source = TRUE)
+
+    origin <- function() {
+      calls <- sys.calls()
+      for (call in rev(calls)) {
+        sr <- attr(call, "srcref")
+        if (!is.null(sr)) {
+          return(paste0(basename(attr(sr, "srcfile")$filename), ":", sr[[1L]]))
+        }
+      }
+      if (length(calls)) paste(deparse(calls[[1L]], nlines = 1L), collapse = "") else ""
+    }
+
+    record <- function(kind, path) {
+      if (busy || !is.character(path) || length(path) != 1L || is.na(path) || !nzchar(path)) return(invisible())
+      if (path %in% c("stdin", "stdout", "stderr", "clipboard") ||
+          grepl("^[A-Za-z][A-Za-z0-9+.-]*://", path)) return(invisible())
+      path <- path.expand(path)
+      if (!grepl("^(/|[A-Za-z]:)", path)) path <- file.path(getwd(), path)
+      key <- paste(kind, gsub("\t", " ", path), sep = "\t")
+      if (!exists(key, envir = seen, inherits = FALSE)) {
+        assign(key, gsub("[\t\n]", " ", origin()), envir = seen)
+      }
+      invisible()
+    }
+
+    connection_hook <- function(env) {
+      open <- env$open
+      if (!is.character(open) || !nzchar(open) || grepl("[r+]", open)) record("read", env$description)
+      if (is.character(open) && grepl("[wa+]", open)) record("write", env$description)
+    }
+    device_hook <- function(env) {
+      record("write", if (exists("filename", envir = env, inherits = FALSE)) env$filename else env$file)
+    }
+
+    patch <- function(envs, name, hook) {
+      if (!exists(name, envir = envs[[1L]], inherits = FALSE)) return(invisible())
+      orig <- get(name, envir = envs[[1L]])
+      wrapped <- orig
+      body(wrapped) <- bquote({ .(hook)(environment()); .(body(orig)) })
+      for (env in envs) {
+        if (!exists(name, envir = env, inherits = FALSE)) next
+        locked <- bindingIsLocked(name, env)
+        if (locked) unlockBinding(name, env)
+        assign(name, wrapped, envir = env)
+        if (locked) lockBinding(name, env)
+      }
+    }
+
+    for (name in c("file", "gzfile", "bzfile", "xzfile")) {
+      patch(list(.BaseNamespaceEnv, baseenv()), name, connection_hook)
+    }
+    patch_devices <- function(...) {
+      for (name in c("png", "jpeg", "bmp", "tiff", "pdf", "svg", "postscript")) {
+        patch(list(asNamespace("grDevices")), name, device_hook)
+      }
+    }
+    if (isNamespaceLoaded("grDevices")) patch_devices() else {
+      setHook(packageEvent("grDevices", "onLoad"), patch_devices)
+    }
+
+    reg.finalizer(seen, function(e) {
+      busy <<- TRUE
+      keys <- ls(seen, all.names = TRUE)
+      if (length(keys)) {
+        origins <- vapply(keys, function(k) get(k, envir = seen), character(1L))
+        cat(paste0(keys, "\t", origins, "\n"), file = trace_file, sep = "", append = TRUE)
+      }
+    }, onexit = TRUE)
+  }
+})
+'''
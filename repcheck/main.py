@@ -1,43 +1,35 @@
 import typer
+import asyncio
 from pathlib import Path
 from typing import List, Optional
 from rich.console import Console
 from rich.table import Table
-from rich.progress import track
+from rich.progress import Progress
 from rich.panel import Panel
 
-from repcheck.languages.r.checker import RScriptChecker
-from repcheck.languages.r.resolver import RScriptOrderResolver
-from repcheck.languages.python.checker import PythonScriptChecker
-from repcheck.languages.python.resolver import PythonScriptOrderResolver
+from repcheck.api import LANGUAGE_CONFIG, SCRIPT_PATTERNS, check_project, plan_project
 from repcheck.core.llm_handler import OllamaHandler
+from repcheck.core.determinism import DeterminismChecker
+from repcheck.core.manifest import OutputManifest
+from repcheck.core.hashing import REPCHECK_DIR
+from repcheck.core.io_tracer import TRACE_DIR
 
 app = typer.Typer(help="Multi-language Script Reproducibility Checker")
 console = Console()
 
-# Language configurations
-LANGUAGE_CONFIG = {
-    "r": {
-        "checker": RScriptChecker,
-        "resolver": RScriptOrderResolver,
-        "patterns": ["**/*.[Rr]"],
-        "name": "R"
-    },
-    "python": {
-        "checker": PythonScriptChecker,
-        "resolver": PythonScriptOrderResolver,
-        "patterns": ["**/*.py"],
-        "name": "Python"
-    }
-}
-
 @app.command()
 def check(
     directory: Path = typer.Option(Path("."), "--dir", "-d"),
     language: str = typer.Option("r", "--lang", "-l", help="Language: r, python"),
     pattern: Optional[List[str]] = typer.Option(None, "--pattern", "-p"),
     exclude: List[str] = typer.Option([], "--exclude", "-x"),
-    no_llm: bool = typer.Option(False, "--no-llm", help="Skip AI analysis")
+    no_llm: bool = typer.Option(False, "--no-llm", help="Skip AI analysis"),
+    llm_tokens: int = typer.Option(512, "--llm-tokens", min=64, help="Token budget for error context sent to the LLM"),
+    trace_io: bool = typer.Option(False, "--trace-io", help="Record files each script reads and writes"),
+    no_preflight: bool = typer.Option(False, "--no-preflight", help="Skip the missing-package check"),
+    repeat: int = typer.Option(1, "--repeat", "-r", min=1, help="Re-run the project K times to detect nondeterminism"),
+    jobs: Optional[int] = typer.Option(None, "--jobs", "-j", min=1, help="Scripts run in parallel (default: 1; K for repeats)"),
+    inputs: List[str] = typer.Option([], "--inputs", help="Glob of read-only input files to hardlink into repeat copies")
 ):
     """Check scripts and show comprehensive results."""
     
@@ -51,54 +43,57 @@ def check(
     patterns = pattern if pattern else config["patterns"]
     
     # Initialize components
-    checker = config["checker"]()
-    resolver = config["resolver"]()
-    llm = OllamaHandler() if not no_llm else None
+    checker = config["checker"](trace_io=trace_io)
+    llm = OllamaHandler(max_context_tokens=llm_tokens) if not no_llm else None
     
     console.print(f"[bold blue]Checking {config['name']} scripts in: {directory}[/bold blue]\n")
     
-    # Find scripts
-    scripts = checker.find_scripts(directory, patterns, exclude)
-    if not scripts:
+    # Find scripts and resolve the order check_project will use
+    plan = plan_project(directory, language, patterns, exclude, checker)
+    if not plan["scripts"]:
         console.print(f"[yellow]No {config['name']} scripts found[/yellow]")
         return
-    
-    # Get execution order
-    order_result = resolver.resolve_execution_order(scripts)
+    execution_order = plan["execution_order"]
     
     # Show execution order first
     console.print("[bold blue]📋 Execution Order:[/bold blue]")
-    if order_result["has_circular_dependency"]:
+    if plan["has_circular_dependency"]:
         console.print("[red]❌ Circular dependency detected![/red]")
         console.print("Scripts found but cannot determine safe execution order:")
-        for script in scripts:
-            console.print(f"  • {script.name}")
-        execution_order = [str(s) for s in scripts]
-    else:
-        execution_order = order_result["execution_order"]
-        
-        # Remove duplicates
-        seen = set()
-        unique_order = []
         for script_path in execution_order:
-            if script_path not in seen:
-                unique_order.append(script_path)
-                seen.add(script_path)
-        execution_order = unique_order
-        
+            console.print(f"  • {Path(script_path).name}")
+    else:
         for i, script_path in enumerate(execution_order, 1):
             console.print(f"  {i}. [cyan]{Path(script_path).name}[/cyan]")
     
     console.print()
     
-    # Check all scripts in order
+    # Report scripts that cannot run because of missing packages before running anything
+    blocked = {}
+    if not no_preflight:
+        with console.status("Checking required packages..."):
+            blocked = asyncio.run(checker.preflight_async(plan["scripts"], plan["dependency_graph"]))
+        
+        if blocked:
+            console.print(f"[bold yellow]📦 Pre-flight: {len(blocked)} script(s) will not be executed:[/bold yellow]")
+            for script_path, reasons in blocked.items():
+                console.print(f"  • [yellow]{Path(script_path).name}[/yellow]: {', '.join(reasons)}")
+            console.print()
+    
+    # Check all scripts in dependency order
     console.print("[bold blue]🔍 Running Checks...[/bold blue]")
-    results = []
     
-    for script_path in track(execution_order, description="Checking scripts..."):
-        result = checker.check_script(Path(script_path))
-        result["execution_order"] = execution_order.index(script_path) + 1
-        results.append(result)
+    async def collect():
+        collected = []
+        with Progress(console=console) as progress:
+            task = progress.add_task("Checking scripts...", total=len(execution_order))
+            async for result in check_project(directory, language, jobs or 1, lint=True,
+                                              checker=checker, plan=plan, blocked=blocked):
+                collected.append(result)
+                progress.advance(task)
+        return sorted(collected, key=lambda r: r["execution_order"])
+    
+    results = asyncio.run(collect())
     
     # Create comprehensive results table
     table = Table(title=f"{config['name']} Script Analysis Results")
@@ -115,6 +110,8 @@ def check(
         
         lint_status = "✅" if result.get("lint_passed", True) else "❌"
         exec_status = "✅" if result["execution_passed"] else "❌"
+        if result.get("preflight_blocked"):
+            lint_status, exec_status = "-", "⏭️"
         duration = f"{result.get('duration', 0):.2f}s"
         
         if result["overall_passed"]:
@@ -126,6 +123,30 @@ def check(
     
     console.print(table)
     
+    # Show traced file I/O
+    if trace_io:
+        io_table = Table(title="Runtime File I/O")
+        io_table.add_column("Script", style="bold")
+        io_table.add_column("Reads", style="dim")
+        io_table.add_column("Writes", style="dim")
+        
+        def describe(entries, script_dir):
+            lines = []
+            for entry in entries:
+                entry_path = Path(entry["path"])
+                name = entry_path.relative_to(script_dir) if entry_path.is_relative_to(script_dir) else entry_path
+                lines.append(f"{name} ({entry['origin']})" if entry["origin"] else str(name))
+            return "\n".join(lines) or "None"
+        
+        for result in results:
+            script_dir = Path(result["path"]).resolve().parent
+            io_table.add_row(Path(result["path"]).name,
+                             describe(result.get("io_reads", []), script_dir),
+                             describe(result.get("io_writes", []), script_dir))
+        
+        console.print(io_table)
+        console.print(f"[dim]Read/write sets saved under {directory / REPCHECK_DIR / TRACE_DIR}[/dim]")
+    
     # Show detailed errors and AI analysis
     failed_results = [r for r in results if not r["overall_passed"]]
     if failed_results:
@@ -140,7 +161,10 @@ def check(
                 console.print(f"[yellow]📝 Lint Issues:[/yellow]")
                 console.print(f"   {lint_output[:200]}...")
             
-            if not result["execution_passed"]:
+            # Pre-flight skipped the script, so there is no error to explain
+            if result.get("preflight_blocked"):
+                console.print(f"[yellow]📦 Not executed: {', '.join(result['preflight_blocked'])}[/yellow]")
+            elif not result["execution_passed"]:
                 error = result.get("stderr", "No error details")
                 console.print(f"[red]💥 Execution Error:[/red]")
                 console.print(f"   {error[:200]}...")
@@ -153,6 +177,33 @@ def check(
                         panel = Panel(explanation, title="🤖 AI Analysis", border_style="blue", padding=(1, 2))
                         console.print(panel)
     
+    # Repeat runs in isolated copies to detect nondeterminism
+    nondeterministic = 0
+    if repeat > 1:
+        console.print(f"\n[bold blue]🔁 Repeating {repeat} runs in isolated copies...[/bold blue]")
+        with console.status("Running repeats..."):
+            det_result = DeterminismChecker(checker, jobs).check(directory, repeat, patterns, exclude, inputs)
+        nondeterministic = det_result["nondeterministic"]
+        
+        det_table = Table(title=f"Determinism Across {repeat} Runs")
+        det_table.add_column("Script", style="bold")
+        det_table.add_column("Exit Codes", justify="center")
+        det_table.add_column("Stdout", justify="center")
+        det_table.add_column("Differing Outputs", style="dim")
+        det_table.add_column("Status", justify="center")
+        
+        for det in det_result["results"]:
+            codes = ", ".join(str(c) for c in det["exit_codes"])
+            stdout_status = "❌" if det["stdout_differs"] else "✅"
+            differing = ", ".join(det["differing_outputs"]) or "None"
+            if det["deterministic"]:
+                status_style = "[green]✅ STABLE[/green]"
+            else:
+                status_style = "[red]❌ DIFFERS[/red]"
+            det_table.add_row(Path(det["path"]).name, codes, stdout_status, differing, status_style)
+        
+        console.print(det_table)
+    
     # Summary
     total = len(results)
     passed = len([r for r in results if r["overall_passed"]])
@@ -163,8 +214,10 @@ def check(
     console.print(f"   ✅ Passed: [green]{passed}[/green]")
     console.print(f"   ❌ Failed: [red]{failed}[/red]")
     console.print(f"   Success Rate: {(passed/total*100):.1f}%")
+    if repeat > 1:
+        console.print(f"   🔁 Nondeterministic: [red]{nondeterministic}[/red]")
     
-    if failed > 0:
+    if failed > 0 or nondeterministic > 0:
         raise typer.Exit(1)
 
 @app.command()
@@ -217,5 +270,115 @@ def order(
     
     console.print(table)
 
+@app.command()
+def snapshot(
+    directory: Path = typer.Option(Path("."), "--dir", "-d"),
+    language: str = typer.Option(..., "--lang", "-l", help="Language verify re-runs: r, python"),
+    pattern: Optional[List[str]] = typer.Option(None, "--pattern", "-p"),
+    exclude: List[str] = typer.Option([], "--exclude", "-x"),
+    outputs: List[str] = typer.Option([], "--outputs", "-o", help="Glob of output files to record (traced writes are always included)"),
+    jobs: Optional[int] = typer.Option(None, "--jobs", "-j", min=1, help="Parallel hashing workers")
+):
+    """Record the project's output files as the expected baseline."""
+    
+    if language not in LANGUAGE_CONFIG:
+        console.print(f"[red]Unsupported language: {language}[/red]")
+        raise typer.Exit(1)
+    
+    # Scripts themselves are not outputs, whatever their language
+    manifest = OutputManifest(directory, SCRIPT_PATTERNS + (pattern or []) + exclude, jobs, outputs)
+    try:
+        with console.status("Hashing output files..."):
+            result = manifest.snapshot(language, pattern)
+    except ValueError as e:
+        console.print(f"[red]{e} (--outputs or `check --trace-io`)[/red]")
+        raise typer.Exit(1)
+    
+    console.print(f"[green]✅ Recorded {result['files']} files ({result['hashed']} hashed) in {result['manifest']}[/green]")
+
+@app.command()
+def verify(
+    directory: Path = typer.Option(Path("."), "--dir", "-d"),
+    language: Optional[str] = typer.Option(None, "--lang", "-l", help="Language: r, python (default: the one recorded by snapshot)"),
+    pattern: Optional[List[str]] = typer.Option(None, "--pattern", "-p"),
+    exclude: List[str] = typer.Option([], "--exclude", "-x"),
+    no_run: bool = typer.Option(False, "--no-run", help="Compare the current files without re-running scripts"),
+    rtol: float = typer.Option(1e-9, "--rtol", help="Relative tolerance for numeric cells in CSV/TSV files"),
+    atol: float = typer.Option(0.0, "--atol", help="Absolute tolerance for numeric cells in CSV/TSV files"),
+    jobs: Optional[int] = typer.Option(None, "--jobs", "-j", min=1, help="Parallel hashing workers")
+):
+    """Re-run scripts and check their outputs against the snapshot baseline."""
+    
+    manifest = OutputManifest(directory, SCRIPT_PATTERNS + (pattern or []) + exclude, jobs)
+    baseline = manifest.load()
+    if baseline is None:
+        console.print(f"[red]No current baseline found at {manifest.manifest_path}, run `snapshot` first[/red]")
+        raise typer.Exit(1)
+    
+    language = language or baseline["language"]
+    if language not in LANGUAGE_CONFIG:
+        console.print(f"[red]Unsupported language: {language}[/red]")
+        raise typer.Exit(1)
+    
+    patterns = pattern or baseline["patterns"] or LANGUAGE_CONFIG[language]["patterns"]
+    manifest.exclude += baseline["patterns"] or []
+    
+    since = None
+    failed_runs = []
+    if not no_run:
+        since = manifest.mark_run_start()
+        
+        async def run_all():
+            failed = []
+            with Progress(console=console) as progress:
+                task = progress.add_task("Running scripts...", total=None)
+                async for result in check_project(directory, language, patterns=patterns,
+                                                  exclude=exclude, lint=False):
+                    if not result["execution_passed"]:
+                        failed.append(Path(result["path"]).name)
+                    progress.advance(task)
+            return failed
+        
+        failed_runs = asyncio.run(run_all())
+    
+    with console.status("Comparing outputs..."):
+        report = manifest.verify(baseline, rtol, atol, since)
+    # Outputs of a failed run cannot be trusted even if they match
+    report["failed_runs"] = failed_runs
+    report["passed"] = report["passed"] and not failed_runs
+    
+    table = Table(title="Output Verification")
+    table.add_column("File", style="bold")
+    table.add_column("Status", justify="center")
+    
+    for name in report["failed_runs"]:
+        table.add_row(name, "[red]💥 RUN FAILED[/red]")
+    for rel in report["differs"]:
+        table.add_row(rel, "[red]❌ DIFFERS[/red]")
+    for rel in report["missing"]:
+        table.add_row(rel, "[red]❌ MISSING[/red]")
+    for rel in report["stale"]:
+        table.add_row(rel, "[red]⌛ NOT REGENERATED[/red]")
+    for rel in report["within_tolerance"]:
+        table.add_row(rel, "[yellow]≈ WITHIN TOLERANCE[/yellow]")
+    for rel in report["new"]:
+        table.add_row(rel, "[blue]➕ NEW[/blue]")
+    
+    if table.row_count:
+        console.print(table)
+    
+    console.print(f"\n[bold]📊 Summary:[/bold]")
+    console.print(f"   ✅ Matched: [green]{len(report['matched'])}[/green]")
+    console.print(f"   ≈ Within tolerance: [yellow]{len(report['within_tolerance'])}[/yellow]")
+    console.print(f"   ❌ Differs: [red]{len(report['differs'])}[/red]")
+    console.print(f"   ❌ Missing: [red]{len(report['missing'])}[/red]")
+    if not no_run:
+        console.print(f"   ⌛ Not regenerated: [red]{len(report['stale'])}[/red]")
+        console.print(f"   💥 Failed scripts: [red]{len(report['failed_runs'])}[/red]")
+    console.print(f"   ➕ New: [blue]{len(report['new'])}[/blue]")
+    
+    if not report["passed"]:
+        raise typer.Exit(1)
+
 if __name__ == "__main__":
     app()
\ No newline at end of file